@@ -1,29 +1,125 @@
-from enum import Enum, auto
+from enum import Enum, IntEnum, auto
 from dataclasses import dataclass
+from bisect import bisect_right
+from array import array
+import sys
 import time
 
+# numba is optional, the state machine works the same without it
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# compiled decision core, built from _acsm.pyx with setup.py, also optional
+try:
+    from _acsm import _Core
+except ImportError:
+    _Core = None
+
+# numpy is optional as well, used to vectorize the multi-zone tick
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 # code implementation explanation
 # we use enum classes to make clean states
+# IntEnum so the hot-path state comparisons are plain int compares
 # the design choice here is so that we have just the two superstates and no off state in between
 # the off state is implemented inside the heater superstate as a standby state
-class SuperState(Enum):
+# IntEnum prints as a bare number, keep the readable Enum text for logs/status
+class SuperState(IntEnum):
     COOLER = auto()
     HEATER = auto()
+    __str__ = Enum.__str__
+    __format__ = Enum.__format__
 
-class CoolerState(Enum):
+class CoolerState(IntEnum):
     COOL_LOW = auto()
     COOL_MEDIUM = auto()
     COOL_HIGH = auto()
+    __str__ = Enum.__str__
+    __format__ = Enum.__format__
 
-class HeaterState(Enum):
+class HeaterState(IntEnum):
     HEAT_STANDBY = auto()
     HEAT_PREHEAT = auto()
     HEAT_RAMP = auto()
     HEAT_MAINTAIN = auto()
+    __str__ = Enum.__str__
+    __format__ = Enum.__format__
+
+# the decision logic as a pure numeric function so it can be JIT compiled
+# returns an integer state code, ordered by increasing delta:
+# 0=COOL_HIGH, 1=COOL_MEDIUM, 2=COOL_LOW, 3=HEAT_STANDBY,
+# 4=HEAT_MAINTAIN, 5=HEAT_PREHEAT, 6=HEAT_RAMP
+def decide_state(current, target, cool_high, cool_med, heat_preheat, heat_ramp, hyst):
+    delta = target - current
+    # need cooling if current > target + hysteresis
+    if delta < -hyst:
+        mag = -delta
+        if mag >= cool_high:
+            return 0
+        if mag >= cool_med:
+            return 1
+        return 2
+    # need heating if delta > hysteresis
+    if delta > hyst:
+        if delta >= heat_ramp:
+            return 6
+        if delta >= heat_preheat:
+            return 5
+        return 4
+    # within hysteresis -> standby
+    return 3
+
+if njit is not None:
+    # the explicit signature compiles eagerly at import instead of on first
+    # call, and cache=True reuses the machine code across runs, so there is
+    # no JIT pause once the control loop is running
+    decide_state = njit(
+        "int64(float64, float64, float64, float64, float64, float64, float64)",
+        cache=True, fastmath=True,
+    )(decide_state)
+
+# fill the +-20 degree, 0.1-step lookup table straight from decide_state,
+# so the (optionally JIT-compiled) kernel defines every entry
+def _build_lut(cool_high, cool_med, heat_preheat, heat_ramp, hyst):
+    return bytearray(
+        decide_state(0.0, q / 10.0, cool_high, cool_med, heat_preheat, heat_ramp, hyst)
+        for q in range(-200, 201)
+    )
+
+# quantized decision boundaries read back off a table built by _build_lut,
+# so decide_state stays the single source of truth for the decision logic
+# boundary i is the smallest quantized delta that gives state code i+1, which
+# means bisect_right over the boundaries reproduces the table (an entry is
+# repeated where two boundaries coincide and the code jumps by more than one)
+def _quantize_thresholds(lut):
+    bounds = []
+    for i in range(1, len(lut)):
+        step = lut[i] - lut[i - 1]
+        if step:
+            bounds.extend([i - 200] * step)
+    return tuple(bounds)
+
+# state code -> (superstate, substate), same order as the codes above
+_CODE_STATES = (
+    (SuperState.COOLER, CoolerState.COOL_HIGH),
+    (SuperState.COOLER, CoolerState.COOL_MEDIUM),
+    (SuperState.COOLER, CoolerState.COOL_LOW),
+    (SuperState.HEATER, HeaterState.HEAT_STANDBY),
+    (SuperState.HEATER, HeaterState.HEAT_MAINTAIN),
+    (SuperState.HEATER, HeaterState.HEAT_PREHEAT),
+    (SuperState.HEATER, HeaterState.HEAT_RAMP),
+)
 
 # this class is added to clarify the thresholds of changing states
 # hysteresis is added to avoid the system changing state because of little change in temperature
-@dataclass
+# slots=True so the config has no per-instance dict, frozen=True makes it
+# immutable so one instance can be shared safely between zones
+@dataclass(slots=True, frozen=True)
 class ACConfig:
     cool_high_delta: float = 4.0
     cool_medium_delta: float = 2.0
@@ -31,11 +127,27 @@ class ACConfig:
     heat_ramp_delta: float = 3.0
     hysteresis: float = 0.3
 
+# shared default so machines created without a config do not each allocate one
+DEFAULT_CFG = ACConfig()
+
 # the main state machine class
 class ACStateMachine:
+    # slots make attribute access an array index instead of a dict probe
+    # and shrink per-instance memory when one machine is made per zone
+    __slots__ = ('cfg', 'current_temp', 'target_temp',
+                 'superstate', 'cooler_state', 'heater_state',
+                 '_hyst', '_cool_high', '_cool_med', '_heat_preheat', '_heat_ramp',
+                 '_cooler_actions', '_heater_actions', '_code_actions', '_lut', '_last_code',
+                 '_q_thresholds',
+                 '_core',
+                 '_log_ts_sec', '_log_ts_str', '_write', '_log_level',
+                 '_status_prefix', '_status_dirty')
+
     # init
     def __init__(self, initial_temp: float, target_temp: float = None, cfg: ACConfig = None):
-        self.cfg = cfg or ACConfig()
+        self.cfg = cfg or DEFAULT_CFG
+        # thresholds copied to flat attributes, one attribute load on the hot path
+        self.refresh_cfg()
         self.current_temp = float(initial_temp)
         self.target_temp = float(target_temp) if target_temp is not None else float(initial_temp)
 
@@ -43,23 +155,65 @@ class ACStateMachine:
         self.cooler_state = None
         self.heater_state = None
 
+        # timestamp cache for log, reformat only when the second changes
+        self._log_ts_sec = -1
+        self._log_ts_str = ""
+        # pre-bound write avoids the print lookup/lock on every log line
+        self._write = sys.stdout.write
+        # 0 disables logging, sites with costly f-strings check this themselves
+        self._log_level = 1
+
+        # the enum part of status() is cached and only reformatted on transitions
+        self._status_prefix = ""
+        self._status_dirty = True
+
+        # dispatch tables, one dict lookup per transition instead of an if/elif ladder
+        self._cooler_actions = {
+            CoolerState.COOL_LOW: self._action_cool_low,
+            CoolerState.COOL_MEDIUM: self._action_cool_medium,
+            CoolerState.COOL_HIGH: self._action_cool_high,
+        }
+        self._heater_actions = {
+            HeaterState.HEAT_STANDBY: self._action_heat_standby,
+            HeaterState.HEAT_PREHEAT: self._action_heat_preheat,
+            HeaterState.HEAT_RAMP: self._action_heat_ramp,
+            HeaterState.HEAT_MAINTAIN: self._action_heat_maintain,
+        }
+        # state code from decide_state -> (superstate, setter, substate)
+        self._code_actions = tuple(
+            (sup, self._set_cooler_state if sup == SuperState.COOLER else self._set_heater_state, st)
+            for sup, st in _CODE_STATES
+        )
+
         self._init_state()
 
+    # re-copy the thresholds, call this again if self.cfg is changed
+    def refresh_cfg(self):
+        c = self.cfg
+        self._hyst = c.hysteresis
+        self._cool_high = c.cool_high_delta
+        self._cool_med = c.cool_medium_delta
+        self._heat_preheat = c.heat_preheat_delta
+        self._heat_ramp = c.heat_ramp_delta
+        self._rebuild_lut()
+        # compiled core does the decision in C when the extension is built,
+        # fed the same quantized boundaries so both paths decide identically
+        self._core = _Core(self._q_thresholds) if _Core is not None else None
+        # the cached code is stale once the table changes
+        self._last_code = -1
+
+    # lookup table from quantized delta to state code, +-20 degrees in 0.1 steps
+    # turns the whole decision into one index instead of a comparison chain
+    def _rebuild_lut(self):
+        self._lut = _build_lut(self._cool_high, self._cool_med,
+                               self._heat_preheat, self._heat_ramp, self._hyst)
+        # quantized boundaries for bisect-style callers, see _quantize_thresholds
+        self._q_thresholds = _quantize_thresholds(self._lut)
+
     # initialize the state
     def _init_state(self):
-        # compute delta, delta > 0 -> heater, delta < 0 -> cooler, should be higher than hysteresis
-        # if delta < hysteresis, then standby
-        delta = self.target_temp - self.current_temp
-        if delta < -self.cfg.hysteresis:
-            self.enter_superstate(SuperState.COOLER)
-            self._choose_cooler_substate(-delta)
-        elif delta > self.cfg.hysteresis:
-            self.enter_superstate(SuperState.HEATER)
-            self._choose_heater_substate(delta)
-        else:
-            # neutral -> heater standby by default
-            self.enter_superstate(SuperState.HEATER)
-            self._set_heater_state(HeaterState.HEAT_STANDBY)
+        # the initial state is just the evaluation of the initial temperatures
+        self._evaluate()
 
     # superstate entry/exit encapsulation
     def enter_superstate(self, s: SuperState):
@@ -68,6 +222,7 @@ class ACStateMachine:
         if self.superstate is not None:
             self._exit_superstate(self.superstate)
         self.superstate = s
+        self._status_dirty = True
         if s == SuperState.COOLER:
             self.on_enter_cooler()
         else:
@@ -100,31 +255,21 @@ class ACStateMachine:
     def _set_cooler_state(self, st: CoolerState):
         if self.cooler_state == st:
             return
-        self.log(f"COOLER: {self.cooler_state} -> {st}")
+        if self._log_level:
+            self.log(f"COOLER: {self.cooler_state} -> {st}")
         self.cooler_state = st
-
-        if st == CoolerState.COOL_LOW:
-            self._action_cool_low()
-        elif st == CoolerState.COOL_MEDIUM:
-            self._action_cool_medium()
-        elif st == CoolerState.COOL_HIGH:
-            self._action_cool_high()
+        self._status_dirty = True
+        self._cooler_actions[st]()
 
     # heater substates actions
     def _set_heater_state(self, st: HeaterState):
         if self.heater_state == st:
             return
-        self.log(f"HEATER: {self.heater_state} -> {st}")
+        if self._log_level:
+            self.log(f"HEATER: {self.heater_state} -> {st}")
         self.heater_state = st
-
-        if st == HeaterState.HEAT_STANDBY:
-            self._action_heat_standby()
-        elif st == HeaterState.HEAT_PREHEAT:
-            self._action_heat_preheat()
-        elif st == HeaterState.HEAT_RAMP:
-            self._action_heat_ramp()
-        elif st == HeaterState.HEAT_MAINTAIN:
-            self._action_heat_maintain()
+        self._status_dirty = True
+        self._heater_actions[st]()
 
     # machine actions
     def _action_cool_low(self):
@@ -148,44 +293,43 @@ class ACStateMachine:
     def _action_heat_maintain(self):
         self.log("Action: maintaining temperature")
 
-    # transitions
-    # absolute value of delta is passed
-    def _choose_cooler_substate(self, delta):
-        if delta >= self.cfg.cool_high_delta:
-            self._set_cooler_state(CoolerState.COOL_HIGH)
-        elif delta >= self.cfg.cool_medium_delta:
-            self._set_cooler_state(CoolerState.COOL_MEDIUM)
-        else:
-            self._set_cooler_state(CoolerState.COOL_LOW)
-
-    def _choose_heater_substate(self, delta):
-        if delta >= self.cfg.heat_ramp_delta:
-            self._set_heater_state(HeaterState.HEAT_RAMP)
-        elif delta >= self.cfg.heat_preheat_delta:
-            self._set_heater_state(HeaterState.HEAT_PREHEAT)
-        else:
-            if delta > self.cfg.hysteresis:
-                self._set_heater_state(HeaterState.HEAT_MAINTAIN)
-            else:
-                self._set_heater_state(HeaterState.HEAT_STANDBY)
-
     # interface
     def set_target_temperature(self, t: float):
-        t = float(t)
-        self.log(f"Target temperature changed {self.target_temp} -> {t}")
+        # sensor/UI inputs are normally floats already, coerce only when needed
+        if type(t) is not float:
+            t = float(t)
+        if self._log_level:
+            self.log(f"Target temperature changed {self.target_temp} -> {t}")
         self.target_temp = t
 
         self._evaluate()
 
     def temperature_update(self, current_temp: float):
-        self.current_temp = float(current_temp)
-        self.log(f"Temperature update: current={self.current_temp}, target={self.target_temp}")
+        self.current_temp = current_temp if type(current_temp) is float else float(current_temp)
+
+        # fast path: most readings are noise that keeps us in the same state,
+        # skip the logging and dispatch entirely in that case
+        if self._lut_code() == self._last_code:
+            return
 
+        if self._log_level:
+            self.log(f"Temperature update: current={self.current_temp}, target={self.target_temp}")
         self._evaluate()
 
+    # batch driver for replaying recorded sensor traces and for benchmarking
+    # temps is any sequence of floats, returns one state code per sample
+    def run_batch(self, temps):
+        codes = bytearray(len(temps))
+        update = self.temperature_update
+        for i, t in enumerate(temps):
+            update(t)
+            codes[i] = self._last_code
+        return codes
+
     # manual override for test purposes
     def manual_set(self, superstate: SuperState, substate):
-        self.log(f"Manual override -> {superstate} / {substate}")
+        if self._log_level:
+            self.log(f"Manual override -> {superstate} / {substate}")
         self.enter_superstate(superstate)
         if superstate == SuperState.COOLER:
             if not isinstance(substate, CoolerState):
@@ -195,42 +339,128 @@ class ACStateMachine:
             if not isinstance(substate, HeaterState):
                 raise ValueError("substate must be HeaterState for HEATER")
             self._set_heater_state(substate)
+        # the override may not match the temperatures, force the next update to re-evaluate
+        self._last_code = -1
 
     # logic
+    def _lut_code(self):
+        if self._core is not None:
+            return self._core.evaluate(self.current_temp, self.target_temp)
+        # quantize delta to the nearest 0.1 degrees and look the state code up
+        # the +200.5 shifts into table range and rounds in one step
+        idx = int((self.target_temp - self.current_temp) * 10.0 + 200.5)
+        idx = 0 if idx < 0 else (400 if idx > 400 else idx)
+        return self._lut[idx]
+
     def _evaluate(self):
-        delta = self.target_temp - self.current_temp
+        self._apply(self._lut_code())
 
-        # need cooling if current > target + hysteresis
-        if delta < -self.cfg.hysteresis:
-            if self.superstate != SuperState.COOLER:
-                self.enter_superstate(SuperState.COOLER)
-            self._choose_cooler_substate(-delta)
-            return
-        
-        # need heating if delta > hysteresis
-        if delta > self.cfg.hysteresis:
-            if self.superstate != SuperState.HEATER:
-                self.enter_superstate(SuperState.HEATER)
-            self._choose_heater_substate(delta)
+    # fused transition: one code compare covers the steady-state case where
+    # neither the superstate nor the substate changes
+    def _apply(self, code):
+        if code == self._last_code:
             return
-        
-        # within hysteresis -> go to standby/maintain
-        # off state is implemented as standby in heater, so we enter heater
-        if self.superstate != SuperState.HEATER:
-            self.enter_superstate(SuperState.HEATER)
-        self._set_heater_state(HeaterState.HEAT_STANDBY)
+        sup, set_state, st = self._code_actions[code]
+        if sup is not self.superstate:
+            self.enter_superstate(sup)
+        set_state(st)
+        self._last_code = code
 
     # helpers
     def log(self, msg: str):
-        print(f"[{time.strftime('%H:%M:%S')}] {msg}")
+        if not self._log_level:
+            return
+        # strftime is expensive, so the formatted timestamp is cached per second
+        sec = int(time.time())
+        if sec != self._log_ts_sec:
+            self._log_ts_sec = sec
+            lt = time.localtime(sec)
+            self._log_ts_str = f"{lt.tm_hour:02d}:{lt.tm_min:02d}:{lt.tm_sec:02d}"
+        self._write(f"[{self._log_ts_str}] {msg}\n")
 
     def status(self) -> str:
-        return (f"superstate={self.superstate}, "
-                f"cooler_state={self.cooler_state}, heater_state={self.heater_state}, "
-                f"current_temp={self.current_temp:.2f}, target_temp={self.target_temp:.2f}")
+        # reformat the enum part only after a transition, temps change every poll
+        if self._status_dirty:
+            self._status_prefix = (f"superstate={self.superstate}, "
+                                   f"cooler_state={self.cooler_state}, heater_state={self.heater_state}, ")
+            self._status_dirty = False
+        return self._status_prefix + f"current_temp={self.current_temp:.2f}, target_temp={self.target_temp:.2f}"
+
+# multi-zone container in SoA layout
+# instead of one ACStateMachine object per room, the temperatures and state
+# codes of all zones live in flat arrays and one tick updates every zone,
+# paying side-effect cost only for zones whose state actually changed
+class ACSystem:
+    __slots__ = ('cfg', 'current', 'target', 'state', '_q_thresholds', '_np_bounds')
+
+    def __init__(self, n_zones: int, cfg: ACConfig = None,
+                 initial_temp: float = 20.0, target_temp: float = 20.0):
+        self.cfg = cfg or DEFAULT_CFG
+        self.current = array('d', [initial_temp]) * n_zones
+        self.target = array('d', [target_temp]) * n_zones
+        c = self.cfg
+        self._q_thresholds = _quantize_thresholds(_build_lut(
+            c.cool_high_delta, c.cool_medium_delta,
+            c.heat_preheat_delta, c.heat_ramp_delta, c.hysteresis))
+        self._np_bounds = np.array(self._q_thresholds, np.int64) if np is not None else None
+        # initial codes are computed silently, transitions are logged from here on
+        self.state = bytearray(self._code(i) for i in range(n_zones))
+
+    def _code(self, i):
+        q = int((self.target[i] - self.current[i]) * 10.0 + 200.5) - 200
+        return bisect_right(self._q_thresholds, q)
+
+    # re-evaluate every zone against its target, log only the transitions
+    # returns the indices of the zones that changed state
+    def tick_all(self):
+        state = self.state
+        if np is not None:
+            # one vectorized pass: quantize every delta, count the boundaries
+            # at or below it with searchsorted, then touch only changed zones
+            cur = np.frombuffer(self.current, np.float64)
+            tgt = np.frombuffer(self.target, np.float64)
+            q = ((tgt - cur) * 10.0 + 200.5).astype(np.int64) - 200
+            codes = np.searchsorted(self._np_bounds, q, side='right')
+            view = np.frombuffer(state, np.uint8)  # writable view of the bytearray
+            idx = np.nonzero(codes != view)[0]
+            view[idx] = codes[idx]
+            changed = [int(i) for i in idx]
+        else:
+            # plain-Python fallback with everything hoisted out of the loop
+            cur = self.current
+            tgt = self.target
+            qt = self._q_thresholds
+            br = bisect_right
+            changed = []
+            for i in range(len(state)):
+                code = br(qt, int((tgt[i] - cur[i]) * 10.0 + 200.5) - 200)
+                if code != state[i]:
+                    state[i] = code
+                    changed.append(i)
+        # transitions are rare by design, so plain logging is fine here
+        for i in changed:
+            sup, st = _CODE_STATES[state[i]]
+            print(f"[{time.strftime('%H:%M:%S')}] zone {i}: {sup} / {st}")
+        return changed
+
+    def zone_status(self, i) -> str:
+        sup, st = _CODE_STATES[self.state[i]]
+        return (f"zone {i}: superstate={sup}, substate={st}, "
+                f"current_temp={self.current[i]:.2f}, target_temp={self.target[i]:.2f}")
 
 #testing
 if __name__== "__main__":
+    # scripted mode: pass a file with one temperature per line to replay it
+    # without the interactive menu, e.g. for stress tests and benchmarks
+    if len(sys.argv) > 1:
+        with open(sys.argv[1]) as f:
+            temps = [float(line) for line in f if line.strip()]
+        ac = ACStateMachine(initial_temp=temps[0])
+        codes = ac.run_batch(temps)
+        print(f"replayed {len(codes)} samples")
+        print(ac.status())
+        sys.exit(0)
+
     init = float(input("Enter initial temperature: "))
     target = float(input("Enter initial target temperature: "))
 
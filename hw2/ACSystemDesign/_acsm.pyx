@@ -0,0 +1,28 @@
+# cython: language_level=3
+# C-level core for the AC state machine decision logic
+# consumes the quantized decision boundaries derived in ACSystemDesign.py and
+# counts how many lie at or below the quantized delta, exactly like the
+# lookup-table/bisect path, so building the extension cannot change decisions
+# state codes: 0=COOL_HIGH, 1=COOL_MEDIUM, 2=COOL_LOW, 3=HEAT_STANDBY,
+# 4=HEAT_MAINTAIN, 5=HEAT_PREHEAT, 6=HEAT_RAMP
+
+cdef class _Core:
+    cdef int nb
+    cdef int bounds[6]
+
+    def __init__(self, boundaries):
+        cdef int i
+        if len(boundaries) > 6:
+            raise ValueError("at most 6 boundaries expected")
+        self.nb = len(boundaries)
+        for i in range(self.nb):
+            self.bounds[i] = boundaries[i]
+
+    cpdef int evaluate(self, double current, double target):
+        # same nearest-0.1-degree quantization as ACStateMachine._lut_code
+        cdef int q = <int>((target - current) * 10.0 + 200.5) - 200
+        cdef int code = 0
+        cdef int i
+        for i in range(self.nb):
+            code += q >= self.bounds[i]
+        return code
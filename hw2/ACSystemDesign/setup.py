@@ -0,0 +1,8 @@
+# build the optional C extension with: python setup.py build_ext --inplace
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name="acsm",
+    ext_modules=cythonize("_acsm.pyx"),
+)